@@ -0,0 +1,21 @@
+"""
+ASGI config for brain_tumor_project.
+
+Exposes the ASGI callable as a module-level variable named ``application``.
+Serve it with uvicorn workers so the async predict_view can overlap
+concurrent uploads in one process:
+
+    gunicorn brain_tumor_project.asgi:application -k uvicorn.workers.UvicornWorker
+"""
+
+import os
+from django.core.asgi import get_asgi_application
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "brain_tumor_project.settings")
+
+application = get_asgi_application()
+
+# Load (and warm up) the model when the server boots, as in wsgi.py
+from classifier.model_loader import ModelLoader  # noqa: E402
+
+ModelLoader.preload()
@@ -61,6 +61,7 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = "brain_tumor_project.wsgi.application"
+ASGI_APPLICATION = "brain_tumor_project.asgi.application"
 
 
 # =============================================================================
@@ -82,6 +83,19 @@ STATICFILES_DIRS = [
     BASE_DIR / "static",
 ]
 
+# collectstatic target, served by nginx in production (see deploy/nginx.conf)
+STATIC_ROOT = BASE_DIR / "staticfiles"
+
+# Content-hashed static filenames, so they can be cached "forever"
+STORAGES = {
+    "default": {
+        "BACKEND": "django.core.files.storage.FileSystemStorage",
+    },
+    "staticfiles": {
+        "BACKEND": "django.contrib.staticfiles.storage.ManifestStaticFilesStorage",
+    },
+}
+
 
 # =============================================================================
 # MEDIA FILES (User Uploads)
@@ -90,25 +104,62 @@ STATICFILES_DIRS = [
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
 
+# Stored uploads (patient MRIs) are deleted by `python manage.py prune_uploads`
+# once they haven't been uploaded again for this many hours
+UPLOAD_RETENTION_HOURS = 24
+
 
 # =============================================================================
 # MODEL CONFIGURATION
 # =============================================================================
-# Path to the trained Keras model file
-MODEL_PATH = BASE_DIR.parent / "1_brain_tumor_vgg16.keras"
+# Path to the trained Keras model file (same directory as manage.py)
+# May also point at a .tflite file produced by `python manage.py convert_model`
+MODEL_PATH = BASE_DIR / "1_brain_tumor_vgg16.keras"
+
+# Serve a .keras model on the GPU, compiled with XLA (needs a CUDA build of
+# TensorFlow instead of tensorflow-cpu). Off for Render's CPU-only free tier.
+INFERENCE_USE_GPU = False
 
 # Class labels matching the training data order
 # These should match train_data.class_indices from your notebook
 CLASS_NAMES = [
     "glioma",
     "meningioma",
-    "No Tumor",
+    "notumor",
     "pituitary",
 ]
 
-# Image preprocessing settings (must match training)
+# Image preprocessing settings (must match training). Conv cost scales with
+# the pixel count, so a model retrained at 128 runs about 3x faster; set this
+# to the model's resolution (ModelLoader refuses a mismatch)
 IMG_SIZE = 224
 
+# Input normalization of the served backbone: "vgg16" (BGR, ImageNet mean
+# subtraction) or "mobilenet_v3" (RGB scaled to [-1, 1]) for a smaller,
+# distilled student model
+MODEL_PREPROCESSING = "vgg16"
+
+# Micro-batching of concurrent predictions (classifier/batching.py): requests
+# arriving within INFERENCE_BATCH_TIMEOUT seconds of each other share one
+# model call of up to INFERENCE_MAX_BATCH_SIZE images. Set the size to 1 to
+# disable (e.g. single-threaded sync workers, where it only adds latency).
+# Only applies to .keras and .onnx models: .tflite models are never batched
+# (they run row by row) and float32 ones get preprocessed straight into their
+# input tensor instead.
+INFERENCE_MAX_BATCH_SIZE = 16
+INFERENCE_BATCH_TIMEOUT = 0.01
+
+# Prediction cache (classifier/views.py): class probabilities of recent
+# uploads, keyed by content digest and a fingerprint of the served model.
+# Per-process memory is enough here; point it at Redis to share it between
+# worker processes.
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "OPTIONS": {"MAX_ENTRIES": 128},
+    }
+}
+
 
 # =============================================================================
 # INTERNATIONALIZATION
@@ -130,7 +181,10 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 # =============================================================================
 # Maximum upload size: 10MB
 DATA_UPLOAD_MAX_MEMORY_SIZE = 10 * 1024 * 1024
-FILE_UPLOAD_MAX_MEMORY_SIZE = 10 * 1024 * 1024
+
+# Uploads larger than this are streamed to a temporary file on disk instead of
+# being buffered in RAM (TensorFlow already uses most of the free tier memory)
+FILE_UPLOAD_MAX_MEMORY_SIZE = 512 * 1024
 
 # Allowed image extensions
 ALLOWED_IMAGE_EXTENSIONS = [".jpg", ".jpeg", ".png", ".bmp", ".gif"]
@@ -7,6 +7,8 @@ Routes all requests to the classifier app.
 from django.conf import settings
 from django.conf.urls.static import static
 from django.urls import path, include
+from django.views.decorators.cache import cache_control
+from django.views.static import serve
 
 urlpatterns = [
     # Main classifier app - handles image upload and prediction
@@ -14,6 +16,14 @@ urlpatterns = [
 ]
 
 # Serve media files during development
-# In production, use a proper web server (nginx, etc.) to serve media
+# In production, use a proper web server (nginx, see deploy/nginx.conf)
+# Uploads are content-addressed, so the browser may cache them for 30 days;
+# they are patient images, so only the browser (private), never shared caches
 if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+    urlpatterns += static(
+        settings.MEDIA_URL,
+        view=cache_control(private=True, max_age=30 * 24 * 60 * 60, immutable=True)(
+            serve
+        ),
+        document_root=settings.MEDIA_ROOT,
+    )
@@ -10,3 +10,10 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "brain_tumor_project.settings")
 
 application = get_wsgi_application()
+
+# Load (and warm up) the model when the server boots, so the first prediction
+# doesn't pay for it. Only servers import this module - management commands
+# (migrate, collectstatic, ...) never do, so they still skip TensorFlow.
+from classifier.model_loader import ModelLoader  # noqa: E402
+
+ModelLoader.preload()
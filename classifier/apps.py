@@ -3,10 +3,11 @@ Classifier app configuration.
 
 This module handles:
 1. App registration with Django
-2. Lazy model loading on first request (not at startup)
 
-The model is loaded lazily to avoid memory issues during migrations
-and to ensure the model is only loaded when actually needed.
+The model is NOT loaded when the app registry is populated, to avoid memory
+issues during migrations and other management commands. It is preloaded by
+brain_tumor_project/asgi.py or wsgi.py when a server (gunicorn/uvicorn or
+runserver) boots.
 """
 
 from django.apps import AppConfig
@@ -25,8 +26,9 @@ class ClassifierConfig(AppConfig):
 
         We intentionally DO NOT load the model here because:
         1. It slows down Django startup (migrations, collectstatic, etc.)
-        2. The model should be loaded only when first inference is needed
+        2. ready() also runs in runserver's autoreloader parent process
 
-        Model loading is handled by the ModelLoader singleton in model_loader.py
+        The model is preloaded from asgi.py / wsgi.py, which only servers
+        import, via the ModelLoader singleton in model_loader.py
         """
         pass
@@ -0,0 +1,123 @@
+"""
+Batching Module - Coalesces concurrent predictions into one model call.
+
+Each request submits its preprocessed (1, H, W, 3) batch and blocks. A single
+background thread collects the requests that arrive within a short window
+(up to a maximum batch size), stacks them into one (N, H, W, 3) batch, runs
+the model once and hands every request its own row back.
+
+Key Design Decisions:
+- Lazy start: The worker thread is started on the first submission
+- Single consumer: Only the worker thread calls the model while batching
+- Disabled at max_batch_size=1: submit() then calls the model directly
+"""
+
+import queue
+import threading
+import time
+
+import numpy as np
+
+
+class _Pending:
+    """A submitted sample waiting for its row of the batched result."""
+
+    __slots__ = ("sample", "done", "result", "error")
+
+    def __init__(self, sample):
+        self.sample = sample
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class BatchScheduler:
+    """
+    Micro-batcher in front of a batched inference function.
+
+    Usage:
+        scheduler = BatchScheduler(ModelLoader.infer, max_batch_size=16)
+        probabilities = scheduler.submit(preprocessed_image)
+    """
+
+    def __init__(self, infer, max_batch_size=16, timeout=0.01):
+        """
+        Args:
+            infer: Callable mapping an (N, H, W, 3) batch to (N, num_classes)
+            max_batch_size: Maximum number of samples per model call
+            timeout: Seconds to wait for more samples after the first one
+        """
+        self._infer = infer
+        self._max_batch_size = max_batch_size
+        self._timeout = timeout
+        self._queue = queue.Queue()
+        self._worker = None
+        self._lock = threading.Lock()
+
+    def submit(self, sample):
+        """
+        Run one sample through the model, batched with concurrent requests.
+
+        Args:
+            sample: float32 array of shape (1, H, W, 3); it is copied into
+                the batch before this call returns, so it may be reused
+                afterwards
+
+        Returns:
+            numpy.ndarray: Class probabilities with shape (num_classes,)
+        """
+        if self._max_batch_size <= 1:
+            return self._infer(sample)[0]
+
+        self._ensure_worker()
+
+        pending = _Pending(sample)
+        self._queue.put(pending)
+        pending.done.wait()
+
+        if pending.error is not None:
+            raise pending.error
+        return pending.result
+
+    def _ensure_worker(self):
+        """
+        Start the background worker thread on first use.
+        """
+        if self._worker is not None:
+            return
+
+        with self._lock:
+            if self._worker is None:
+                self._worker = threading.Thread(
+                    target=self._run, name="inference-batcher", daemon=True
+                )
+                self._worker.start()
+
+    def _run(self):
+        """
+        Worker loop: collect a batch, run the model once, scatter the rows.
+        """
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self._timeout
+
+            while len(batch) < self._max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            try:
+                inputs = np.concatenate([pending.sample for pending in batch])
+                outputs = self._infer(inputs)
+                for pending, row in zip(batch, outputs):
+                    pending.result = row
+            except Exception as e:
+                for pending in batch:
+                    pending.error = e
+            finally:
+                for pending in batch:
+                    pending.done.set()
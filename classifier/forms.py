@@ -8,6 +8,19 @@ from django import forms
 from django.conf import settings
 from pathlib import Path
 
+# Resolved once at import time instead of on every validation
+_ALLOWED_EXTENSIONS = tuple(
+    getattr(
+        settings,
+        "ALLOWED_IMAGE_EXTENSIONS",
+        [".jpg", ".jpeg", ".png", ".bmp", ".gif"],
+    )
+)
+_ALLOWED_EXTENSION_SET = frozenset(_ALLOWED_EXTENSIONS)
+
+# Maximum upload size: 10MB in bytes
+_MAX_SIZE = 10 * 1024 * 1024
+
 
 class ImageUploadForm(forms.Form):
     """
@@ -19,6 +32,9 @@ class ImageUploadForm(forms.Form):
     - File size is within limits
     """
 
+    # ImageField is the only Pillow user left: it opens the upload to verify
+    # it is an image (header/structure only, pixels are not decoded). The
+    # actual decode for the model goes through OpenCV's libjpeg-turbo.
     image = forms.ImageField(
         label="Upload Brain MRI Image",
         help_text="Supported formats: JPG, JPEG, PNG, BMP, GIF. Max size: 10MB",
@@ -47,21 +63,15 @@ class ImageUploadForm(forms.Form):
 
         # Check file extension
         file_ext = Path(image.name).suffix.lower()
-        allowed_extensions = getattr(
-            settings,
-            "ALLOWED_IMAGE_EXTENSIONS",
-            [".jpg", ".jpeg", ".png", ".bmp", ".gif"],
-        )
 
-        if file_ext not in allowed_extensions:
+        if file_ext not in _ALLOWED_EXTENSION_SET:
             raise forms.ValidationError(
                 f"Invalid file type '{file_ext}'. "
-                f"Allowed types: {', '.join(allowed_extensions)}"
+                f"Allowed types: {', '.join(_ALLOWED_EXTENSIONS)}"
             )
 
         # Check file size (10MB max)
-        max_size = 10 * 1024 * 1024  # 10MB in bytes
-        if image.size > max_size:
+        if image.size > _MAX_SIZE:
             raise forms.ValidationError(
                 f"File too large. Maximum size is 10MB, "
                 f"your file is {image.size / (1024*1024):.1f}MB"
@@ -0,0 +1 @@
+# classifier/management/__init__.py
@@ -0,0 +1 @@
+# classifier/management/commands/__init__.py
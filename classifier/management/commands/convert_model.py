@@ -0,0 +1,168 @@
+"""
+Management command: convert the Keras model to TFLite or ONNX.
+
+Runs OFFLINE (on a development machine, not on the Render instance):
+
+    python manage.py convert_model                    # float16 TFLite
+    python manage.py convert_model --quantize int8 --representative-dir path/to/mri_samples
+    python manage.py convert_model --format onnx      # needs tf2onnx
+
+Then point settings.MODEL_PATH at the generated ``.tflite`` / ``.onnx`` file;
+ModelLoader picks the runtime from the file extension.
+"""
+
+import os
+from itertools import islice
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from classifier.preprocessing import preprocess_image
+
+
+class Command(BaseCommand):
+    help = "Convert the Keras model to a (quantized) TFLite or ONNX model for CPU inference."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--source",
+            default=str(settings.MODEL_PATH),
+            help="Keras model to convert (default: settings.MODEL_PATH)",
+        )
+        parser.add_argument(
+            "--output",
+            help="Output path (default: next to the source model)",
+        )
+        parser.add_argument(
+            "--format",
+            choices=["tflite", "onnx"],
+            default="tflite",
+            help="tflite: TFLite FlatBuffer; onnx: ONNX graph for onnxruntime",
+        )
+        parser.add_argument(
+            "--quantize",
+            choices=["int8", "float16", "none"],
+            default="float16",
+            help=(
+                "TFLite only. float16 (default): half-precision weights; "
+                "int8: full-integer post-training quantization, only faster "
+                "on CPUs with int8 dot-product support (VNNI/dotprod); "
+                "none: float32"
+            ),
+        )
+        parser.add_argument(
+            "--representative-dir",
+            help="Directory of sample MRI images used to calibrate int8 ranges",
+        )
+        parser.add_argument(
+            "--samples",
+            type=int,
+            default=100,
+            help="Number of representative images to use (default: 100)",
+        )
+
+    def handle(self, *args, **options):
+        source = Path(options["source"])
+        if not source.exists():
+            raise CommandError(f"Model file not found at: {source}")
+
+        if (
+            options["format"] == "tflite"
+            and options["quantize"] == "int8"
+            and not options["representative_dir"]
+        ):
+            raise CommandError("--representative-dir is required for int8 quantization")
+
+        os.environ.setdefault("TF_CPP_MIN_LOG_LEVEL", "2")
+        import tensorflow as tf
+
+        model = tf.keras.models.load_model(str(source), compile=False)
+
+        if options["format"] == "onnx":
+            output = options["output"] or source.with_suffix(".onnx")
+            self._convert_onnx(tf, model, output)
+        else:
+            output = options["output"] or source.with_name(
+                f"{source.stem}_{options['quantize']}.tflite"
+            )
+            self._convert_tflite(tf, model, output, options)
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Wrote {output}. Set MODEL_PATH to this file to serve it."
+            )
+        )
+
+    def _convert_onnx(self, tf, model, output):
+        """
+        Export the model to ONNX (opset 17) with a dynamic batch dimension.
+        """
+        try:
+            import tf2onnx
+        except ImportError as exc:
+            raise CommandError("ONNX export requires: pip install tf2onnx") from exc
+
+        input_signature = [
+            tf.TensorSpec(
+                (None, settings.IMG_SIZE, settings.IMG_SIZE, 3),
+                tf.float32,
+                name="input",
+            )
+        ]
+        # Export the inference forward pass as a tf.function rather than via
+        # from_keras, which relies on Keras 2 model internals (output_names)
+        # that Keras 3 (shipped with TensorFlow >= 2.16) no longer has
+        forward = tf.function(lambda x: model(x, training=False))
+        tf2onnx.convert.from_function(
+            forward,
+            input_signature=input_signature,
+            opset=17,
+            output_path=str(output),
+        )
+
+    def _convert_tflite(self, tf, model, output, options):
+        """
+        Convert the model to a TFLite FlatBuffer, optionally quantized.
+        """
+        quantize = options["quantize"]
+        converter = tf.lite.TFLiteConverter.from_keras_model(model)
+
+        if quantize == "int8":
+            samples = self._representative_images(
+                Path(options["representative_dir"]), options["samples"]
+            )
+
+            def representative_dataset():
+                # preprocess_image reuses its output buffer, so yield copies
+                for sample in samples:
+                    yield [preprocess_image(sample).copy()]
+
+            converter.optimizations = [tf.lite.Optimize.DEFAULT]
+            converter.representative_dataset = representative_dataset
+            converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+            # Fully integer I/O: ModelLoader quantizes the float32 batch and
+            # dequantizes the probabilities with the tensors' scale/zero-point
+            converter.inference_input_type = tf.uint8
+            converter.inference_output_type = tf.uint8
+        elif quantize == "float16":
+            # Halves the weight size; inputs/outputs stay float32
+            converter.optimizations = [tf.lite.Optimize.DEFAULT]
+            converter.target_spec.supported_types = [tf.float16]
+
+        Path(output).write_bytes(converter.convert())
+
+    def _representative_images(self, directory, limit):
+        """
+        Collect up to ``limit`` image paths from ``directory`` (recursively).
+        """
+        extensions = set(settings.ALLOWED_IMAGE_EXTENSIONS)
+        images = (
+            path
+            for path in sorted(directory.rglob("*"))
+            if path.suffix.lower() in extensions
+        )
+        samples = list(islice(images, limit))
+        if not samples:
+            raise CommandError(f"No images found in {directory}")
+        return samples
@@ -0,0 +1,63 @@
+"""
+Management command: delete stored uploads older than the retention period.
+
+Uploads are kept under MEDIA_ROOT only so the result page can show them
+(see classifier/uploads.py). Run this periodically, e.g. hourly from cron:
+
+    python manage.py prune_uploads              # settings.UPLOAD_RETENTION_HOURS
+    python manage.py prune_uploads --hours 6
+"""
+
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = "Delete uploaded images older than the retention period from MEDIA_ROOT."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--hours",
+            type=float,
+            default=settings.UPLOAD_RETENTION_HOURS,
+            help=(
+                "Delete uploads not stored or re-uploaded within this many "
+                "hours (default: settings.UPLOAD_RETENTION_HOURS)"
+            ),
+        )
+
+    def handle(self, *args, **options):
+        if options["hours"] < 0:
+            raise CommandError("--hours must not be negative")
+
+        media_root = Path(settings.MEDIA_ROOT)
+        if not media_root.is_dir():
+            self.stdout.write("No uploads to prune.")
+            return
+
+        cutoff = time.time() - options["hours"] * 60 * 60
+        deleted = 0
+
+        # Uploads live in two-character shard directories (ab/cdef....jpg);
+        # files directly under MEDIA_ROOT (e.g. .gitkeep) are left alone
+        for shard in media_root.iterdir():
+            if not shard.is_dir():
+                continue
+            for path in shard.iterdir():
+                try:
+                    if path.is_file() and path.stat().st_mtime < cutoff:
+                        path.unlink()
+                        deleted += 1
+                except FileNotFoundError:
+                    # Removed concurrently (another prune or a rename)
+                    continue
+            try:
+                shard.rmdir()
+            except OSError:
+                # Not empty (or recreated by a new upload)
+                pass
+
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} stored upload(s)."))
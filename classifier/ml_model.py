@@ -1,67 +1,44 @@
 """
-ML Model Module - Loads TensorFlow and Model ONCE at module level.
+ML Model Module - Lazy access to the TensorFlow model.
 
 CRITICAL for Render Free Tier:
-- TensorFlow is imported ONCE here
-- Model is loaded ONCE when this module is first imported
-- Thread limits are set BEFORE any TensorFlow operations
-- NO TensorFlow imports anywhere else in the project
+- TensorFlow is NOT imported when this module is imported
+- Model is loaded ONCE: preloaded when the server boots, otherwise on first
+  access to ``ml_model.model``
+- Loading (and thread limits) is handled by ModelLoader in model_loader.py
+- NO module-level TensorFlow imports anywhere in the project
+
+This keeps ``manage.py migrate``, ``collectstatic``, ``shell`` and every other
+management command from paying the TensorFlow + Keras import cost.
 """
 
-import os
 from pathlib import Path
 
-# Suppress TensorFlow warnings
-os.environ["TF_CPP_MIN_LOG_LEVEL"] = "2"
+from django.conf import settings
 
-import tensorflow as tf
-
-# =============================================================================
-# HARD LIMITS FOR RENDER FREE TIER - MUST BE SET BEFORE MODEL LOAD
-# =============================================================================
-tf.config.threading.set_intra_op_parallelism_threads(1)
-tf.config.threading.set_inter_op_parallelism_threads(1)
-
-# Disable GPU (not available on Render free tier anyway)
-tf.config.set_visible_devices([], "GPU")
+from .model_loader import ModelLoader
 
 # =============================================================================
 # MODEL PATH CONFIGURATION
 # =============================================================================
-# BASE_DIR is the Django project root (where manage.py is)
-BASE_DIR = Path(__file__).resolve().parent.parent
-
-# Model file should be in the same directory as manage.py
-MODEL_PATH = BASE_DIR / "1_brain_tumor_vgg16.keras"
-
-# Alternative paths (uncomment if model is elsewhere):
-# MODEL_PATH = BASE_DIR / "classifier" / "model" / "model.keras"
-# MODEL_PATH = Path("/opt/render/project/src/1_brain_tumor_vgg16.keras")
+# Single source of truth is settings.MODEL_PATH (next to manage.py by default)
+MODEL_PATH = Path(settings.MODEL_PATH)
 
 # =============================================================================
-# LOAD MODEL ONCE AT MODULE IMPORT
+# CLASS NAMES (must match training order) - defined in settings
 # =============================================================================
-print(f"[ml_model] Loading model from: {MODEL_PATH}")
+CLASS_NAMES = settings.CLASS_NAMES
 
-if not MODEL_PATH.exists():
-    raise FileNotFoundError(
-        f"Model file not found at: {MODEL_PATH}\n"
-        f"Please ensure '1_brain_tumor_vgg16.keras' is in the correct location."
-    )
+IMG_SIZE = settings.IMG_SIZE
 
-# Load model with compile=False (inference only, no training)
-model = tf.keras.models.load_model(str(MODEL_PATH), compile=False)
-
-print(f"[ml_model] Model loaded successfully. Input shape: {model.input_shape}")
 
 # =============================================================================
-# CLASS NAMES (must match training order)
+# LAZY MODEL ACCESS (PEP 562)
 # =============================================================================
-CLASS_NAMES = [
-    "glioma",
-    "meningioma",
-    "notumor",
-    "pituitary",
-]
-
-IMG_SIZE = 224
+def __getattr__(name):
+    """
+    Resolve ``ml_model.model`` on first access instead of at import time.
+    """
+    if name == "model":
+        return ModelLoader.get_model()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
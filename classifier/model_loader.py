@@ -1,39 +1,138 @@
 """
 Model Loader Module - Singleton Pattern for TensorFlow Model.
 
-This module provides a thread-safe, lazy-loading mechanism for the Keras model.
-The model is loaded only once on first request and cached in memory.
+This module provides a thread-safe, load-once mechanism for the Keras model.
+The model is preloaded when the server boots (asgi.py / wsgi.py call
+ModelLoader.preload()) and cached in memory.
 
 Key Design Decisions:
-- Lazy loading: Model not loaded until first prediction request
+- Preloading: Servers load and warm up the model at startup, so no request
+  pays for it; management commands never import TensorFlow
+- Lazy fallback: If the model wasn't preloaded (e.g. it was missing at boot,
+  or in a shell), it is loaded on first use
 - Singleton: Only one model instance in memory
 - Thread-safe: Uses threading.Lock for safe concurrent access
+- Format by extension: settings.MODEL_PATH may point at the original
+  ``.keras`` model or at a ``.tflite`` / ``.onnx`` file produced by
+  ``python manage.py convert_model``. ONNX models (onnxruntime) and TFLite
+  models with ``tflite_runtime`` installed never import TensorFlow.
 """
 
+import os
 import threading
 from pathlib import Path
+
+import numpy as np
 from django.conf import settings
 
 
+def _import_tensorflow():
+    """
+    Import TensorFlow with the resource limits used for serving.
+
+    Imported here (never at module level) to avoid loading it during
+    Django startup.
+    """
+    # Suppress TensorFlow warnings (must be set before the import)
+    os.environ.setdefault("TF_CPP_MIN_LOG_LEVEL", "2")
+
+    import tensorflow as tf
+
+    # Limit TensorFlow threads for Render Free tier (low memory/CPU)
+    tf.config.threading.set_intra_op_parallelism_threads(1)
+    tf.config.threading.set_inter_op_parallelism_threads(1)
+
+    # Disable GPU (not available on Render free tier anyway) unless the
+    # deployment opts in with settings.INFERENCE_USE_GPU
+    if not getattr(settings, "INFERENCE_USE_GPU", False):
+        tf.config.set_visible_devices([], "GPU")
+
+    return tf
+
+
+def _quantize(batch, details):
+    """
+    Convert a float32 batch to the input dtype of a quantized TFLite model.
+    """
+    dtype = details["dtype"]
+    if dtype == np.float32:
+        return batch
+
+    scale, zero_point = details["quantization"]
+    info = np.iinfo(dtype)
+    quantized = np.round(batch / scale + zero_point)
+    return np.clip(quantized, info.min, info.max).astype(dtype)
+
+
+def _make_dequantizer(details):
+    """
+    Return a function converting a TFLite output tensor back to float32.
+
+    8-bit outputs are mapped through a 256-entry lookup table built once at
+    load time, instead of doing the float arithmetic on every request.
+    """
+    dtype = np.dtype(details["dtype"])
+    if dtype == np.float32:
+        return lambda output: output
+
+    scale, zero_point = details["quantization"]
+    if dtype.itemsize == 1:
+        # Entry i holds the value of the code whose raw byte is i
+        codes = np.arange(256, dtype=np.uint8).view(dtype)
+        table = ((codes.astype(np.float32) - zero_point) * scale).astype(np.float32)
+        return lambda output: table[output.view(np.uint8)]
+
+    return lambda output: (output.astype(np.float32) - zero_point) * scale
+
+
+def _check_input_size(shape):
+    """
+    Ensure the model's input resolution matches settings.IMG_SIZE.
+
+    Preprocessing resizes to IMG_SIZE, so a model trained at another
+    resolution (e.g. a 128x128 retrain) needs IMG_SIZE changed with it.
+    Dynamic (unknown) dimensions are accepted.
+
+    Raises:
+        ValueError: If the input height or width differs from IMG_SIZE
+    """
+    height, width = shape[1], shape[2]
+    for dim in (height, width):
+        known = isinstance(dim, (int, np.integer)) and dim > 0
+        if known and dim != settings.IMG_SIZE:
+            raise ValueError(
+                f"Model expects {height}x{width} inputs but settings.IMG_SIZE "
+                f"is {settings.IMG_SIZE}. Set IMG_SIZE to the resolution the "
+                f"model was trained at."
+            )
+
+
 class ModelLoader:
     """
     Singleton class for loading and caching the Keras model.
 
     Usage:
+        probabilities = ModelLoader.infer(preprocessed_image)
+
+        # or, for direct access to the underlying model / runtime
         model = ModelLoader.get_model()
-        predictions = model.predict(preprocessed_image)
     """
 
     _model = None
+    _infer = None
+    _infer_in_place = None
+    _supports_batching = False
     _lock = threading.Lock()
 
     @classmethod
     def get_model(cls):
         """
-        Get the loaded Keras model. Loads on first call.
+        Get the loaded model. Loads on first call.
 
         Returns:
-            tensorflow.keras.Model: The loaded brain tumor classification model
+            tensorflow.keras.Model, tf.lite.Interpreter or
+            onnxruntime.InferenceSession: The loaded brain tumor
+            classification model
 
         Raises:
             FileNotFoundError: If model file doesn't exist
@@ -53,20 +152,83 @@ class ModelLoader:
             return cls._model
 
     @classmethod
-    def _load_model(cls):
+    def preload(cls):
         """
-        Internal method to load the Keras model from disk.
+        Load the model ahead of the first request (called at server startup).
+
+        A missing model file is only reported here; predict_view shows the
+        error to the user on the first prediction instead.
+        """
+        try:
+            cls.get_model()
+        except FileNotFoundError as e:
+            print(f"[ModelLoader] Preload skipped: {e}")
+
+    @classmethod
+    def infer(cls, batch):
+        """
+        Run a forward pass through the loaded model.
+
+        For Keras models this calls a tf.function traced once at load time
+        instead of model.predict, skipping Keras's per-call overhead
+        (argument validation, batch splitting, callbacks) for single-image
+        requests. TFLite and ONNX models run on their own runtimes.
+
+        Args:
+            batch: float32 array of shape (N, IMG_SIZE, IMG_SIZE, 3)
 
         Returns:
-            The loaded Keras model
+            numpy.ndarray: Class probabilities with shape (N, num_classes)
         """
-        # Import TensorFlow here to avoid loading it during Django startup
-        import tensorflow as tf
+        cls.get_model()
+        return cls._infer(batch)
 
-        # Limit TensorFlow threads for Render Free tier (low memory/CPU)
-        tf.config.threading.set_intra_op_parallelism_threads(1)
-        tf.config.threading.set_inter_op_parallelism_threads(1)
+    @classmethod
+    def supports_batching(cls):
+        """
+        Whether one forward pass over N images is cheaper than N passes.
+
+        True for Keras models and ONNX models with a dynamic batch
+        dimension. TFLite models run batches row by row, so micro-batching
+        them only adds the batch window to every request.
+
+        Returns:
+            bool: True if requests should be micro-batched
+        """
+        cls.get_model()
+        return cls._supports_batching
 
+    @classmethod
+    def infer_in_place(cls, fill):
+        """
+        Run a single-image forward pass, preprocessing into the model input.
+
+        Float32 TFLite models expose their input tensor as a NumPy view of
+        the interpreter's memory, so ``fill`` writes the preprocessed image
+        there directly and no (1, H, W, 3) copy is made per request. Other
+        models are filled through a regular buffer and run via infer().
+
+        Args:
+            fill: Callable taking the float32 (1, IMG_SIZE, IMG_SIZE, 3)
+                array to write into (or None to use its own buffer) and
+                returning the filled array, e.g. a preprocess_image partial
+
+        Returns:
+            numpy.ndarray: Class probabilities with shape (num_classes,)
+        """
+        cls.get_model()
+        if cls._infer_in_place is not None:
+            return cls._infer_in_place(fill)
+        return cls._infer(fill(None))[0]
+
+    @classmethod
+    def _load_model(cls):
+        """
+        Internal method to load the model from disk.
+
+        Returns:
+            The loaded Keras model, TFLite interpreter or ONNX session
+        """
         model_path = Path(settings.MODEL_PATH)
 
         if not model_path.exists():
@@ -77,16 +239,41 @@ class ModelLoader:
 
         print(f"[ModelLoader] Loading model from: {model_path}")
 
+        if model_path.suffix == ".onnx":
+            return cls._load_onnx(model_path)
+
+        if model_path.suffix == ".tflite":
+            return cls._load_tflite(model_path)
+
+        tf = _import_tensorflow()
+
         # Load the Keras model
         # compile=False since we only need inference, not training
         model = tf.keras.models.load_model(str(model_path), compile=False)
+        _check_input_size(model.input_shape)
+
+        # Wrap the forward pass in a tf.function with a fixed input signature
+        # and trace it now, so no request pays the tracing cost. The batch
+        # dimension is left open for batched inference (see batching.py).
+        # On GPU, XLA fuses the conv/bias/ReLU layers into a few kernels,
+        # cutting the per-layer kernel launches that dominate at batch 1.
+        input_shape = (1, settings.IMG_SIZE, settings.IMG_SIZE, 3)
+        input_spec = tf.TensorSpec((None,) + input_shape[1:], tf.float32)
+        forward = tf.function(
+            lambda x: model(x, training=False),
+            input_signature=[input_spec],
+            jit_compile=getattr(settings, "INFERENCE_USE_GPU", False),
+        ).get_concrete_function()
 
-        # Warm up the model with a dummy prediction
-        # This initializes all internal TensorFlow graphs for faster first real prediction
-        import numpy as np
+        # Warm up with one direct call on float32 zeros: initializes kernels
+        # and weights (and runs the XLA compile, on GPU) without
+        # model.predict's PredictLoop/callback machinery
+        forward(tf.constant(np.zeros(input_shape, dtype=np.float32)))
 
-        dummy_input = np.zeros((1, settings.IMG_SIZE, settings.IMG_SIZE, 3))
-        _ = model.predict(dummy_input, verbose=0)
+        # Call the concrete function directly: this also skips tf.function's
+        # per-call signature matching and trace-cache lookup
+        cls._infer = lambda batch: forward(tf.constant(batch)).numpy()
+        cls._supports_batching = True
 
         print(
             f"[ModelLoader] Model loaded successfully. Input shape: {model.input_shape}"
@@ -94,6 +281,123 @@ class ModelLoader:
 
         return model
 
+    @classmethod
+    def _load_tflite(cls, model_path):
+        """
+        Internal method to load a converted TFLite model.
+
+        Uses the lightweight ``tflite_runtime`` package when installed, so
+        full TensorFlow is never imported; falls back to tf.lite otherwise.
+        Float (fp32/fp16) models run on the default XNNPACK CPU delegate.
+
+        Quantized (int8/uint8) inputs and outputs are converted from/to
+        float32 here, so callers always pass the regular preprocessed batch.
+
+        Returns:
+            Interpreter: The ready-to-invoke interpreter
+        """
+        try:
+            from tflite_runtime.interpreter import Interpreter
+        except ImportError:
+            Interpreter = _import_tensorflow().lite.Interpreter
+
+        interpreter = Interpreter(model_path=str(model_path), num_threads=1)
+        interpreter.allocate_tensors()
+
+        input_details = interpreter.get_input_details()[0]
+        output_details = interpreter.get_output_details()[0]
+        _check_input_size(input_details["shape"])
+        dequantize = _make_dequantizer(output_details)
+
+        # A single interpreter must not be invoked from two threads at once
+        invoke_lock = threading.Lock()
+
+        def run_one(sample):
+            with invoke_lock:
+                interpreter.set_tensor(
+                    input_details["index"], _quantize(sample, input_details)
+                )
+                interpreter.invoke()
+                output = interpreter.get_tensor(output_details["index"])
+            return dequantize(output)
+
+        def run(batch):
+            # The converted graph has a fixed batch of 1; resizing the input
+            # tensor per call would re-plan the whole arena, so run row by row
+            if len(batch) == 1:
+                return run_one(batch)
+            return np.concatenate([run_one(batch[i : i + 1]) for i in range(len(batch))])
+
+        # Warm up: the first invoke() finalizes tensor allocation and
+        # initializes the XNNPACK delegate
+        run(np.zeros(input_details["shape"], dtype=np.float32))
+        cls._infer = run
+
+        if input_details["dtype"] == np.float32:
+            # Accessor for a NumPy view of the input tensor's arena memory.
+            # The view itself must not be held across calls, so it is
+            # re-fetched each time (cheap: no copy).
+            input_view = interpreter.tensor(input_details["index"])
+
+            def run_in_place(fill):
+                # The lock covers filling too: the input tensor is shared
+                with invoke_lock:
+                    fill(input_view())
+                    interpreter.invoke()
+                    output = interpreter.get_tensor(output_details["index"])
+                return dequantize(output)[0]
+
+            cls._infer_in_place = run_in_place
+
+        print(
+            f"[ModelLoader] TFLite model loaded successfully. "
+            f"Input: {input_details['shape']} {input_details['dtype'].__name__}"
+        )
+
+        return interpreter
+
+    @classmethod
+    def _load_onnx(cls, model_path):
+        """
+        Internal method to load a converted ONNX model with onnxruntime.
+
+        All graph optimizations (constant folding, Conv+activation fusion)
+        are enabled; onnxruntime sessions are safe to run concurrently.
+
+        Returns:
+            onnxruntime.InferenceSession: The optimized inference session
+        """
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        options.intra_op_num_threads = 1
+        options.inter_op_num_threads = 1
+
+        session = ort.InferenceSession(
+            str(model_path), options, providers=["CPUExecutionProvider"]
+        )
+        input_name = session.get_inputs()[0].name
+        _check_input_size(session.get_inputs()[0].shape)
+        output_name = session.get_outputs()[0].name
+
+        def run(batch):
+            return session.run([output_name], {input_name: batch})[0]
+
+        # Warm up: the first run() allocates buffers and picks kernels
+        run(np.zeros((1, settings.IMG_SIZE, settings.IMG_SIZE, 3), dtype=np.float32))
+        cls._infer = run
+        # convert_model exports a dynamic (named) batch dimension
+        batch_dim = session.get_inputs()[0].shape[0]
+        cls._supports_batching = not isinstance(batch_dim, int)
+
+        print(
+            f"[ModelLoader] ONNX model loaded successfully. "
+            f"Input shape: {session.get_inputs()[0].shape}"
+        )
+
+        return session
+
     @classmethod
     def clear_model(cls):
         """
@@ -101,3 +405,6 @@ class ModelLoader:
         """
         with cls._lock:
             cls._model = None
+            cls._infer = None
+            cls._infer_in_place = None
+            cls._supports_batching = False
@@ -4,105 +4,210 @@ Preprocessing Module - OpenCV based with VGG16 preprocessing.
 Uses VGG16 preprocessing to match training:
 - RGB to BGR conversion
 - ImageNet mean subtraction
+
+This is tensorflow.keras.applications.vgg16.preprocess_input ("caffe" mode)
+written in NumPy, so the request path never has to import TensorFlow/Keras.
 """
 
+import os
+import threading
+
 import cv2
 import numpy as np
-import base64
-from io import BytesIO
-from PIL import Image
+from django.conf import settings
 
-# Image size must match model training
-IMG_SIZE = 224
+# Image size must match model training (read once from settings at import)
+IMG_SIZE = settings.IMG_SIZE
 
 # ImageNet means for VGG16 preprocessing (in BGR order)
-IMAGENET_MEAN_BGR = [103.939, 116.779, 123.68]
-
-
-def preprocess_image(image_file):
+IMAGENET_MEAN_BGR = np.array([103.939, 116.779, 123.68], dtype=np.float32)
+
+# Input normalization per backbone: channel order, then
+# model_input = (pixel - offset) * scale
+_NORMALIZATION = {
+    # tensorflow.keras.applications.vgg16.preprocess_input ("caffe" mode)
+    "vgg16": ("BGR", IMAGENET_MEAN_BGR, np.float32(1.0)),
+    # mobilenet_v3 / efficientnet students trained on [-1, 1] inputs ("tf" mode)
+    "mobilenet_v3": ("RGB", np.float32(127.5), np.float32(1 / 127.5)),
+}
+_CHANNEL_ORDER, _OFFSET, _SCALE = _NORMALIZATION[
+    getattr(settings, "MODEL_PREPROCESSING", "vgg16")
+]
+
+# Reduced-resolution decode modes, largest factor first. For JPEGs libjpeg
+# scales the IDCT itself (1/2, 1/4 or 1/8), so far fewer pixels are decoded.
+_REDUCED_DECODE_FLAGS = (
+    (8, cv2.IMREAD_REDUCED_COLOR_8),
+    (4, cv2.IMREAD_REDUCED_COLOR_4),
+    (2, cv2.IMREAD_REDUCED_COLOR_2),
+)
+
+# Per-thread working buffers (resized image + model input tensor), allocated
+# once per worker thread and reused across requests
+_buffers = threading.local()
+
+
+def read_image_bytes(image_file):
     """
-    Preprocess an uploaded image for model inference.
-
-    Applies VGG16 preprocessing to match training:
-    1. Read image from file buffer
-    2. Resize to 224x224
-    3. Convert RGB to BGR (VGG16 was trained on BGR)
-    4. Subtract ImageNet means
-    5. Add batch dimension
+    Read the raw bytes of an uploaded image exactly once.
 
     Args:
-        image_file: Django UploadedFile or file-like object
+        image_file: bytes, memoryview, Django UploadedFile, file-like object
+            or filesystem path
 
     Returns:
-        numpy.ndarray: Preprocessed image with shape (1, 224, 224, 3)
+        bytes or memoryview: The raw (still encoded) image content
     """
-    # Read file content into buffer
+    if isinstance(image_file, (bytes, bytearray, memoryview)):
+        return image_file
+
     if hasattr(image_file, "read"):
-        file_bytes = image_file.read()
+        content = image_file.read()
         # Reset file pointer for potential reuse
         if hasattr(image_file, "seek"):
             image_file.seek(0)
-    else:
-        with open(image_file, "rb") as f:
-            file_bytes = f.read()
+        return content
 
-    # Decode image using OpenCV
-    # cv2.IMREAD_COLOR ensures 3 channels (BGR)
-    nparr = np.frombuffer(file_bytes, np.uint8)
-    image = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+    with open(image_file, "rb") as f:
+        return f.read()
 
-    if image is None:
-        raise ValueError("Could not decode image. Please upload a valid image file.")
 
-    # OpenCV loads as BGR - keep it as BGR for VGG16
-    # Resize to model input size
-    image = cv2.resize(image, (IMG_SIZE, IMG_SIZE), interpolation=cv2.INTER_LANCZOS4)
+def get_image_source(image_file):
+    """
+    Return the cheapest handle on an uploaded image's content.
 
-    # Convert to float32
-    image = image.astype(np.float32)
+    Uploads Django has spilled to disk (TemporaryUploadedFile) are returned
+    as their temporary file path, so they never have to be materialized as a
+    Python bytes object. Everything else is read once via read_image_bytes.
 
-    # Apply VGG16 preprocessing: subtract ImageNet means (BGR order)
-    # This matches tensorflow.keras.applications.vgg16.preprocess_input
-    image[:, :, 0] -= IMAGENET_MEAN_BGR[0]  # Blue channel
-    image[:, :, 1] -= IMAGENET_MEAN_BGR[1]  # Green channel
-    image[:, :, 2] -= IMAGENET_MEAN_BGR[2]  # Red channel
+    Args:
+        image_file: Django UploadedFile or any input read_image_bytes accepts
 
-    # Add batch dimension: (224, 224, 3) -> (1, 224, 224, 3)
-    image = np.expand_dims(image, axis=0)
+    Returns:
+        str or bytes: Path to the file on disk, or the raw image bytes
+    """
+    if hasattr(image_file, "temporary_file_path"):
+        return image_file.temporary_file_path()
+    return read_image_bytes(image_file)
 
-    return image
 
+def jpeg_size_hint(image_file):
+    """
+    Return the (width, height) of a JPEG upload, if already known.
 
-def get_original_image_base64(image_file):
+    Django's ImageField leaves the Pillow image it used for validation on
+    the upload as ``image_file.image``; only its header was parsed, so this
+    costs nothing. Non-JPEG uploads return None (see _decode_flag).
+
+    Args:
+        image_file: Django UploadedFile (validated by ImageUploadForm)
+
+    Returns:
+        tuple or None: (width, height) for JPEG uploads, otherwise None
     """
-    Convert uploaded image to base64 for display in browser.
+    image = getattr(image_file, "image", None)
+    if image is None or image.format != "JPEG":
+        return None
+    return image.size
+
+
+def _decode_flag(jpeg_size):
+    """
+    Pick the OpenCV decode mode for an image of the given JPEG dimensions.
+
+    Uses the largest reduction that still leaves the shortest side at least
+    IMG_SIZE, so the resize below remains a downscale. Reduced modes only
+    save work for JPEGs; other formats are decoded at full size anyway.
+    """
+    if jpeg_size is None:
+        return cv2.IMREAD_COLOR
+
+    shortest = min(jpeg_size)
+    for factor, flag in _REDUCED_DECODE_FLAGS:
+        if shortest // factor >= IMG_SIZE:
+            return flag
+    return cv2.IMREAD_COLOR
+
+
+def _thread_buffer(name, shape, dtype):
+    """
+    Return this thread's preallocated buffer called ``name``, creating it once.
+    """
+    buf = getattr(_buffers, name, None)
+    if buf is None:
+        buf = np.empty(shape, dtype=dtype)
+        setattr(_buffers, name, buf)
+    return buf
+
+
+def preprocess_image(image_file, jpeg_size=None, out=None):
+    """
+    Preprocess an uploaded image for model inference.
+
+    Applies VGG16 preprocessing to match training:
+    1. Read image from file buffer
+    2. Resize to 224x224
+    3. Convert RGB to BGR (VGG16 was trained on BGR)
+    4. Subtract ImageNet means
+    5. Add batch dimension
+
+    A different backbone's normalization can be selected with
+    settings.MODEL_PREPROCESSING (see _NORMALIZATION).
 
     Args:
-        image_file: Django UploadedFile
+        image_file: Raw image bytes or a path on disk (preferred, see
+            get_image_source), Django UploadedFile or file-like object
+        jpeg_size: (width, height) of a JPEG image, see jpeg_size_hint.
+            When given, large JPEGs are decoded at 1/2, 1/4 or 1/8 scale.
+        out: float32 array of shape (1, 224, 224, 3) to write the result
+            into, e.g. the model's own input tensor (see
+            ModelLoader.infer_in_place)
 
     Returns:
-        str: Base64 encoded image string with data URI prefix
+        numpy.ndarray: Preprocessed image with shape (1, 224, 224, 3).
+        Without ``out`` the array is a per-thread buffer that is overwritten
+        by the next call, so it must be consumed before preprocessing
+        another image.
     """
-    # Read file content
-    if hasattr(image_file, "read"):
-        content = image_file.read()
-        if hasattr(image_file, "seek"):
-            image_file.seek(0)
+    # Decode image using OpenCV
+    # cv2.IMREAD_COLOR (and the reduced variants) ensure 3 channels (BGR)
+    flag = _decode_flag(jpeg_size)
+    if isinstance(image_file, (str, os.PathLike)):
+        # Let OpenCV read straight from disk (no Python bytes copy)
+        image = cv2.imread(os.fspath(image_file), flag)
+    else:
+        file_bytes = read_image_bytes(image_file)
+        nparr = np.frombuffer(file_bytes, np.uint8)
+        image = cv2.imdecode(nparr, flag)
+
+    if image is None:
+        raise ValueError("Could not decode image. Please upload a valid image file.")
+
+    # OpenCV loads as BGR - keep it as BGR for VGG16
+    # Resize to model input size. INTER_AREA is the cheap, alias-free choice
+    # for downscaling; fall back to bilinear for the rare image smaller than
+    # the model input.
+    if min(image.shape[:2]) >= IMG_SIZE:
+        interpolation = cv2.INTER_AREA
     else:
-        with open(image_file, "rb") as f:
-            content = f.read()
-
-    # Encode to base64
-    encoded = base64.b64encode(content).decode("utf-8")
-
-    # Determine MIME type using PIL
-    img = Image.open(BytesIO(content))
-    format_to_mime = {
-        "JPEG": "image/jpeg",
-        "PNG": "image/png",
-        "GIF": "image/gif",
-        "BMP": "image/bmp",
-    }
-    mime_type = format_to_mime.get(img.format, "image/jpeg")
-
-    return f"data:{mime_type};base64,{encoded}"
+        interpolation = cv2.INTER_LINEAR
+    resized = _thread_buffer("resized", (IMG_SIZE, IMG_SIZE, 3), np.uint8)
+    cv2.resize(
+        image, (IMG_SIZE, IMG_SIZE), dst=resized, interpolation=interpolation
+    )
+
+    # Apply VGG16 preprocessing: subtract ImageNet means (BGR order)
+    # This matches tensorflow.keras.applications.vgg16.preprocess_input
+    # The uint8 -> float32 cast and the mean subtraction happen in a single
+    # pass, written straight into the batched (1, 224, 224, 3) input tensor.
+    # RGB backbones read the same buffer through a reversed-channel view.
+    pixels = resized if _CHANNEL_ORDER == "BGR" else resized[..., ::-1]
+    batch = out
+    if batch is None:
+        batch = _thread_buffer("input", (1, IMG_SIZE, IMG_SIZE, 3), np.float32)
+    np.subtract(pixels, _OFFSET, out=batch[0], dtype=np.float32)
+    if _SCALE != 1.0:
+        np.multiply(batch[0], _SCALE, out=batch[0])
+
+    return batch
+
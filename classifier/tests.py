@@ -0,0 +1,338 @@
+"""
+Tests for the classifier app.
+
+None of these load the model or import TensorFlow; run them with:
+
+    python manage.py test classifier
+"""
+
+import os
+import tempfile
+import threading
+import time
+from io import StringIO
+from pathlib import Path
+from unittest import mock
+
+import cv2
+import numpy as np
+from django.core.management import call_command
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import SimpleTestCase, override_settings
+
+from . import views
+from .batching import BatchScheduler
+from .model_loader import ModelLoader, _make_dequantizer, _quantize
+from .preprocessing import IMAGENET_MEAN_BGR, _decode_flag, preprocess_image
+from .uploads import content_digest, store_upload
+
+
+def _fixture_png():
+    """
+    Encode a deterministic 400x300 BGR gradient as PNG (lossless).
+    """
+    y, x = np.mgrid[0:300, 0:400]
+    image = np.stack(
+        [x * 255 // 399, y * 255 // 299, (x + y) % 256], axis=-1
+    ).astype(np.uint8)
+    ok, encoded = cv2.imencode(".png", image)
+    assert ok
+    return image, encoded.tobytes()
+
+
+class PreprocessImageTests(SimpleTestCase):
+    """preprocess_image must match VGG16's training preprocessing."""
+
+    # Mean of the fixture after VGG16 "caffe" preprocessing, i.e.
+    # tensorflow.keras.applications.vgg16.preprocess_input on the 224x224
+    # INTER_AREA resize (BGR, ImageNet mean subtracted, no scaling)
+    GOLDEN_MEAN = 11.7646
+
+    def test_golden_mean(self):
+        _, content = _fixture_png()
+        batch = preprocess_image(content)
+
+        self.assertEqual(batch.shape, (1, 224, 224, 3))
+        self.assertEqual(batch.dtype, np.float32)
+        self.assertAlmostEqual(float(batch.mean()), self.GOLDEN_MEAN, places=4)
+
+    def test_matches_caffe_preprocessing(self):
+        image, content = _fixture_png()
+        resized = cv2.resize(image, (224, 224), interpolation=cv2.INTER_AREA)
+        expected = resized.astype(np.float32) - IMAGENET_MEAN_BGR
+
+        np.testing.assert_allclose(preprocess_image(content)[0], expected, atol=1e-4)
+
+    def test_writes_into_out(self):
+        _, content = _fixture_png()
+        out = np.zeros((1, 224, 224, 3), dtype=np.float32)
+
+        self.assertIs(preprocess_image(content, out=out), out)
+        self.assertAlmostEqual(float(out.mean()), self.GOLDEN_MEAN, places=4)
+
+    def test_rejects_undecodable_bytes(self):
+        with self.assertRaises(ValueError):
+            preprocess_image(b"not an image")
+
+
+class DecodeFlagTests(SimpleTestCase):
+    """_decode_flag picks the largest JPEG reduction that keeps IMG_SIZE."""
+
+    def test_unknown_size_decodes_in_full(self):
+        self.assertEqual(_decode_flag(None), cv2.IMREAD_COLOR)
+
+    def test_reduction_keeps_shortest_side_at_img_size(self):
+        self.assertEqual(_decode_flag((4000, 3000)), cv2.IMREAD_REDUCED_COLOR_8)
+        self.assertEqual(_decode_flag((1200, 900)), cv2.IMREAD_REDUCED_COLOR_4)
+        self.assertEqual(_decode_flag((1000, 500)), cv2.IMREAD_REDUCED_COLOR_2)
+        self.assertEqual(_decode_flag((400, 300)), cv2.IMREAD_COLOR)
+
+
+class QuantizationTests(SimpleTestCase):
+    """Quantized TFLite inputs/outputs convert to and from float32."""
+
+    def test_int8_lookup_table_matches_arithmetic(self):
+        details = {"dtype": np.int8, "quantization": (0.5, -3)}
+        codes = np.arange(-128, 128, dtype=np.int8).reshape(1, -1)
+
+        expected = (codes.astype(np.float32) + 3) * 0.5
+        np.testing.assert_array_equal(_make_dequantizer(details)(codes), expected)
+
+    def test_uint8_lookup_table_matches_arithmetic(self):
+        details = {"dtype": np.uint8, "quantization": (1 / 256, 0)}
+        codes = np.arange(256, dtype=np.uint8).reshape(1, -1)
+
+        expected = codes.astype(np.float32) / 256
+        np.testing.assert_allclose(_make_dequantizer(details)(codes), expected)
+
+    def test_int8_round_trip(self):
+        details = {"dtype": np.int8, "quantization": (0.5, -3)}
+        values = np.linspace(-60, 60, 241, dtype=np.float32).reshape(1, -1)
+
+        quantized = _quantize(values, details)
+        self.assertEqual(quantized.dtype, np.int8)
+        restored = _make_dequantizer(details)(quantized)
+        np.testing.assert_allclose(restored, values, atol=0.25)
+
+    def test_float32_passes_through(self):
+        details = {"dtype": np.float32, "quantization": (0.0, 0)}
+        values = np.ones((1, 4), dtype=np.float32)
+
+        self.assertIs(_quantize(values, details), values)
+        self.assertIs(_make_dequantizer(details)(values), values)
+
+
+class BatchSchedulerTests(SimpleTestCase):
+    """BatchScheduler hands every request its own row back."""
+
+    @staticmethod
+    def _sample(value):
+        return np.full((1, 2, 2, 3), value, dtype=np.float32)
+
+    def test_scatters_rows_to_their_requests(self):
+        calls = []
+
+        def infer(batch):
+            calls.append(len(batch))
+            return batch.reshape(len(batch), -1)[:, :1] * 10
+
+        scheduler = BatchScheduler(infer, max_batch_size=8, timeout=0.5)
+        barrier = threading.Barrier(8)
+        results = {}
+
+        def submit(value):
+            barrier.wait()
+            results[value] = scheduler.submit(self._sample(value))
+
+        threads = [threading.Thread(target=submit, args=(i,)) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(timeout=5)
+
+        self.assertEqual(
+            {value: float(row[0]) for value, row in results.items()},
+            {value: value * 10.0 for value in range(8)},
+        )
+        self.assertEqual(sum(calls), 8)
+        self.assertLess(len(calls), 8)
+
+    def test_propagates_errors_to_every_request(self):
+        def infer(batch):
+            raise RuntimeError("model failed")
+
+        scheduler = BatchScheduler(infer, max_batch_size=4, timeout=0.01)
+
+        with self.assertRaisesMessage(RuntimeError, "model failed"):
+            scheduler.submit(self._sample(1))
+        # The worker survives a failed batch
+        with self.assertRaisesMessage(RuntimeError, "model failed"):
+            scheduler.submit(self._sample(2))
+
+    def test_batch_size_one_calls_model_directly(self):
+        scheduler = BatchScheduler(
+            lambda batch: batch.reshape(len(batch), -1)[:, :1], max_batch_size=1
+        )
+
+        self.assertEqual(float(scheduler.submit(self._sample(3))[0]), 3.0)
+        self.assertIsNone(scheduler._worker)
+
+
+class _LoadedModelMixin:
+    """Stand in for a loaded model without loading (or importing) one."""
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        _, self.content = _fixture_png()
+        self.probabilities = np.array([0.1, 0.2, 0.3, 0.4], dtype=np.float32)
+
+    def _loaded(self, supports_batching):
+        fill_into = np.zeros((1, 224, 224, 3), dtype=np.float32)
+
+        def infer_in_place(fill):
+            fill(fill_into)
+            return self.probabilities
+
+        patches = [
+            mock.patch.object(ModelLoader, "_model", object()),
+            mock.patch.object(ModelLoader, "_supports_batching", supports_batching),
+            mock.patch.object(ModelLoader, "_infer_in_place", infer_in_place),
+            mock.patch.object(views, "_scheduler"),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+        views._scheduler.submit.return_value = self.probabilities
+        return fill_into
+
+
+class ClassifyTests(_LoadedModelMixin, SimpleTestCase):
+    """_classify only micro-batches runtimes that benefit from it."""
+
+    def test_unbatchable_runtime_skips_the_scheduler(self):
+        fill_into = self._loaded(supports_batching=False)
+
+        result = views._classify(self.content, "a" * 32, None)
+
+        np.testing.assert_array_equal(result, self.probabilities)
+        views._scheduler.submit.assert_not_called()
+        # Preprocessing wrote straight into the model's input buffer
+        self.assertAlmostEqual(
+            float(fill_into.mean()), PreprocessImageTests.GOLDEN_MEAN, places=4
+        )
+
+    def test_batchable_runtime_goes_through_the_scheduler(self):
+        self._loaded(supports_batching=True)
+
+        result = views._classify(self.content, "b" * 32, None)
+
+        np.testing.assert_array_equal(result, self.probabilities)
+        views._scheduler.submit.assert_called_once()
+
+    def test_cached_probabilities_skip_inference(self):
+        self._loaded(supports_batching=True)
+        views._classify(self.content, "c" * 32, None)
+
+        views._classify(self.content, "c" * 32, None)
+
+        views._scheduler.submit.assert_called_once()
+
+
+class PredictViewTests(_LoadedModelMixin, SimpleTestCase):
+    """predict_view runs its blocking steps on the long-lived thread pool."""
+
+    def setUp(self):
+        super().setUp()
+        media_root = tempfile.TemporaryDirectory()
+        self.addCleanup(media_root.cleanup)
+        settings_override = override_settings(MEDIA_ROOT=media_root.name)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def test_post_renders_prediction(self):
+        self._loaded(supports_batching=False)
+        threads = []
+        real_classify = views._classify
+
+        def classify(*args):
+            threads.append(threading.current_thread().name)
+            return real_classify(*args)
+
+        with mock.patch.object(views, "_classify", classify):
+            response = self.client.post(
+                "/",
+                {"image": SimpleUploadedFile("scan.png", self.content, "image/png")},
+            )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.context["success"])
+        self.assertEqual(response.context["prediction"], views.CLASS_NAMES[3])
+        self.assertAlmostEqual(response.context["confidence"], 40.0, places=4)
+        self.assertTrue(threads[0].startswith("predict"))
+
+
+class UploadStorageTests(SimpleTestCase):
+    """Uploads are stored once, under their content digest."""
+
+    def setUp(self):
+        self.media_root = tempfile.TemporaryDirectory()
+        self.addCleanup(self.media_root.cleanup)
+        settings_override = override_settings(
+            MEDIA_ROOT=self.media_root.name, MEDIA_URL="/media/"
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def test_digest_of_path_matches_digest_of_bytes(self):
+        content = b"\x89PNG\r\n\x1a\n" + bytes(range(256)) * 1000
+        path = Path(self.media_root.name) / "upload.png"
+        path.write_bytes(content)
+
+        self.assertEqual(len(content_digest(content)), 32)
+        self.assertEqual(content_digest(path), content_digest(content))
+
+    def test_store_upload_is_content_addressed(self):
+        _, content = _fixture_png()
+        digest = content_digest(content)
+
+        url = store_upload(content, "Scan.PNG")
+        self.assertEqual(url, f"/media/{digest[:2]}/{digest[2:]}.png")
+        stored = Path(self.media_root.name) / digest[:2] / f"{digest[2:]}.png"
+        self.assertEqual(stored.read_bytes(), content)
+
+        # Storing the same bytes again reuses the file
+        self.assertEqual(store_upload(content, "other.png", digest), url)
+        self.assertEqual(len(list(stored.parent.iterdir())), 1)
+
+    def test_prune_uploads_deletes_only_expired_files(self):
+        old_url = store_upload(b"old scan", "old.jpg")
+        new_url = store_upload(b"new scan", "new.jpg")
+        media_root = Path(self.media_root.name)
+        old_path = media_root / old_url.removeprefix("/media/")
+        new_path = media_root / new_url.removeprefix("/media/")
+        keep = media_root / ".gitkeep"
+        keep.touch()
+
+        two_days_ago = time.time() - 48 * 60 * 60
+        os.utime(old_path, (two_days_ago, two_days_ago))
+        os.utime(keep, (two_days_ago, two_days_ago))
+
+        call_command("prune_uploads", hours=24, stdout=StringIO())
+
+        self.assertFalse(old_path.exists())
+        self.assertFalse(old_path.parent.exists())
+        self.assertTrue(new_path.exists())
+        self.assertTrue(keep.exists())
+
+    def test_storing_again_keeps_upload_from_being_pruned(self):
+        url = store_upload(b"scan", "scan.jpg")
+        path = Path(self.media_root.name) / url.removeprefix("/media/")
+        two_days_ago = time.time() - 48 * 60 * 60
+        os.utime(path, (two_days_ago, two_days_ago))
+
+        store_upload(b"scan", "scan.jpg")
+        call_command("prune_uploads", hours=24, stdout=StringIO())
+
+        self.assertTrue(path.exists())
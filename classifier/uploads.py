@@ -0,0 +1,92 @@
+"""
+Upload Storage Module - Content-addressed storage for uploaded images.
+
+Uploaded images are written once to MEDIA_ROOT, named after the BLAKE2b
+digest of their bytes, and shown in the page by URL instead of being inlined as a
+base64 data URI. Identical uploads map to the same file.
+
+Stored files are only kept for UPLOAD_RETENTION_HOURS: the prune_uploads
+management command deletes older ones.
+
+The same digest also keys the prediction cache in views.py, so each upload
+is hashed only once per request.
+"""
+
+import hashlib
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+from django.conf import settings
+
+# Read size used when hashing uploads that live on disk
+_CHUNK_SIZE = 64 * 1024
+
+# Digest size in bytes (32 hex characters in file names and cache keys)
+_DIGEST_SIZE = 16
+
+
+def content_digest(content):
+    """
+    Return the hex digest identifying an upload's content.
+
+    BLAKE2b with a 128-bit digest: faster than SHA-256 on CPUs without SHA
+    extensions, and still collision-resistant enough for content addressing.
+
+    Args:
+        content: Raw image bytes, or a path to a file holding them
+            (hashed in chunks so it is never fully loaded into memory)
+    """
+    if not isinstance(content, (str, os.PathLike)):
+        return hashlib.blake2b(content, digest_size=_DIGEST_SIZE).hexdigest()
+
+    blake2b = hashlib.blake2b(digest_size=_DIGEST_SIZE)
+    with open(content, "rb") as f:
+        for chunk in iter(lambda: f.read(_CHUNK_SIZE), b""):
+            blake2b.update(chunk)
+    return blake2b.hexdigest()
+
+
+def store_upload(content, name, digest=None):
+    """
+    Save raw image bytes under MEDIA_ROOT and return their public URL.
+
+    Files are sharded into two-character prefix directories
+    (``ab/cdef....jpg``) to keep directory sizes small.
+
+    Args:
+        content: Raw image bytes, or a path to a file holding them
+            (see preprocessing.get_image_source)
+        name: Original file name; only its extension is kept
+        digest: content_digest(content), if the caller already computed it
+
+    Returns:
+        str: URL of the stored image, under MEDIA_URL
+    """
+    if digest is None:
+        digest = content_digest(content)
+    ext = Path(name).suffix.lower()
+    relative = f"{digest[:2]}/{digest[2:]}{ext}"
+
+    path = Path(settings.MEDIA_ROOT) / relative
+    try:
+        # Already stored: refresh its age so prune_uploads keeps it while
+        # it is still being shown
+        os.utime(path)
+    except FileNotFoundError:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Write to a temporary file and rename so concurrent requests for the
+        # same image never see a partially written file
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent)
+        with os.fdopen(fd, "wb") as f:
+            if isinstance(content, (str, os.PathLike)):
+                with open(content, "rb") as src:
+                    shutil.copyfileobj(src, f)
+            else:
+                f.write(content)
+        # mkstemp creates 0600 files; make them readable by the web server
+        os.chmod(tmp_path, settings.FILE_UPLOAD_PERMISSIONS or 0o644)
+        os.replace(tmp_path, path)
+
+    return f"{settings.MEDIA_URL}{relative}"
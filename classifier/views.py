@@ -5,17 +5,134 @@ Main view handles:
 1. GET: Display upload form
 2. POST: Process image, run inference, display results
 
-Model is imported from ml_model.py (loaded ONCE at startup).
+The model is fetched from ModelLoader (loaded ONCE, when the server boots).
+
+predict_view is an async view. Its blocking steps (hashing, storing the
+upload, preprocessing and inference) run on one long-lived thread pool, so
+per-thread preprocessing buffers are reused and the micro-batcher sees
+concurrent requests whether the view is served over ASGI (see asgi.py, the
+recommended setup) or WSGI, where Django runs it in a fresh event loop for
+every request.
 """
 
+import asyncio
+import hashlib
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from pathlib import Path
+
+from django.conf import settings
+from django.core.cache import cache
 from django.shortcuts import render
 
+from .batching import BatchScheduler
 from .forms import ImageUploadForm
-from .ml_model import model, CLASS_NAMES  # Model loaded ONCE at import
-from .preprocessing import preprocess_image, get_original_image_base64
+from .ml_model import CLASS_NAMES
+from .model_loader import ModelLoader
+from .preprocessing import get_image_source, jpeg_size_hint, preprocess_image
+from .uploads import content_digest, store_upload
+
+logger = logging.getLogger(__name__)
 
+# Class probabilities are cached (Django cache framework, see CACHES in
+# settings) under the upload's content digest, so re-submitting the same image
+# skips preprocessing and inference entirely
+PREDICTION_CACHE_TIMEOUT = 60 * 60
 
-def predict_view(request):
+
+def _model_fingerprint():
+    """
+    Identify the served model, so cached predictions never outlive it.
+
+    Covers the model file (path and modification time) and the settings that
+    change its inputs. Computed once at import; a redeploy with another model
+    (or a shared cache such as Redis) then starts from fresh keys.
+    """
+    model_path = Path(settings.MODEL_PATH)
+    try:
+        mtime = model_path.stat().st_mtime_ns
+    except OSError:
+        mtime = 0
+    parts = (
+        str(model_path.resolve()),
+        str(mtime),
+        getattr(settings, "MODEL_PREPROCESSING", "vgg16"),
+        str(settings.IMG_SIZE),
+    )
+    return hashlib.blake2b("|".join(parts).encode(), digest_size=8).hexdigest()
+
+
+_CACHE_KEY_PREFIX = f"pred:{_model_fingerprint()}:"
+
+# Runs the view's blocking steps. Module-level (not asyncio.to_thread) so the
+# threads outlive each request's event loop: under WSGI Django creates a new
+# loop, and with it a new default executor, per request. Sized so a full
+# micro-batch can be preprocessed while uploads are still being written.
+_executor = ThreadPoolExecutor(
+    max_workers=max(4, settings.INFERENCE_MAX_BATCH_SIZE + 2),
+    thread_name_prefix="predict",
+)
+
+# Coalesces concurrent requests into batched model calls
+_scheduler = BatchScheduler(
+    ModelLoader.infer,
+    max_batch_size=settings.INFERENCE_MAX_BATCH_SIZE,
+    timeout=settings.INFERENCE_BATCH_TIMEOUT,
+)
+
+
+def _get_cached_probabilities(digest):
+    """
+    Return cached probabilities for an upload digest, or None on a miss.
+    """
+    return cache.get(_CACHE_KEY_PREFIX + digest)
+
+
+def _cache_probabilities(digest, probabilities):
+    """
+    Remember probabilities for an upload digest.
+    """
+    cache.set(_CACHE_KEY_PREFIX + digest, probabilities, PREDICTION_CACHE_TIMEOUT)
+
+
+def _classify(source, digest, jpeg_size):
+    """
+    Return class probabilities for an upload (blocking; run in a thread).
+
+    Preprocessing and inference run in the same thread, because
+    preprocess_image returns a per-thread buffer that is only valid until
+    that thread preprocesses its next image.
+
+    Args:
+        source: Raw image bytes or path on disk (see get_image_source)
+        digest: Content digest of the upload (see content_digest)
+        jpeg_size: (width, height) of a JPEG upload, or None
+
+    Returns:
+        numpy.ndarray: Class probabilities with shape (num_classes,)
+    """
+    probabilities = _get_cached_probabilities(digest)
+    if probabilities is None:
+        # Preprocess image for model (OpenCV-based, no TensorFlow).
+        # Large JPEGs are decoded at reduced scale.
+        preprocess = partial(preprocess_image, source, jpeg_size=jpeg_size)
+
+        if settings.INFERENCE_MAX_BATCH_SIZE > 1 and ModelLoader.supports_batching():
+            # Run inference using the cached model, batched with any
+            # concurrent requests
+            probabilities = _scheduler.submit(preprocess()).copy()
+        else:
+            # Unbatched (or a runtime such as TFLite that gains nothing from
+            # batching): preprocess straight into the model's input tensor
+            probabilities = ModelLoader.infer_in_place(
+                lambda out: preprocess(out=out)
+            ).copy()
+        _cache_probabilities(digest, probabilities)
+    return probabilities
+
+
+async def predict_view(request):
     """
     Main prediction view.
 
@@ -24,10 +141,9 @@ def predict_view(request):
 
     Template context on POST:
         - form: The upload form (for re-submission)
-        - image_data: Base64 encoded image for preview
+        - image_url: MEDIA_URL of the stored upload for preview
         - prediction: Predicted class name
         - confidence: Confidence percentage (0-100)
-        - all_predictions: List of (class_name, probability) tuples
         - error: Error message if something went wrong
     """
     context = {
@@ -44,42 +160,39 @@ def predict_view(request):
                 # Get uploaded file
                 image_file = form.cleaned_data["image"]
 
-                # Convert to base64 for preview display
-                image_data = get_original_image_base64(image_file)
-                context["image_data"] = image_data
+                # Read the upload once and share it between helpers. Large
+                # uploads stay on disk and are passed around by path.
+                source = get_image_source(image_file)
+                loop = asyncio.get_running_loop()
+                digest = await loop.run_in_executor(_executor, content_digest, source)
+
+                # Store the upload once and reference it by URL for preview
+                # (instead of inlining it into the page as base64). The blocking
+                # work runs on the thread pool, so the write overlaps with
+                # preprocessing and inference and the event loop stays free
+                # to accept other uploads meanwhile.
+                stored = loop.run_in_executor(
+                    _executor, store_upload, source, image_file.name, digest
+                )
+                try:
+                    probabilities = await loop.run_in_executor(
+                        _executor, _classify, source, digest, jpeg_size_hint(image_file)
+                    )
+                finally:
+                    # Wait even on failure: the upload's temporary file must
+                    # outlive the background copy
+                    context["image_url"] = await stored
                 context["image_name"] = image_file.name
 
-                # Preprocess image for model (OpenCV-based, no TensorFlow)
-                preprocessed = preprocess_image(image_file)
-
-                # Run inference using pre-loaded model
-                predictions = model.predict(preprocessed, verbose=0)
-                probabilities = predictions[0]  # Get first (and only) batch item
-
-                # Get predicted class
+                # The page shows only the top class and its confidence, so
+                # no per-class ranking is built
                 predicted_idx = int(probabilities.argmax())
                 predicted_class = CLASS_NAMES[predicted_idx]
-                confidence = float(probabilities[predicted_idx]) * 100
-
-                # Build all predictions list for display
-                all_predictions = []
-                for idx, class_name in enumerate(CLASS_NAMES):
-                    prob = float(probabilities[idx]) * 100
-                    all_predictions.append(
-                        {
-                            "class_name": class_name,
-                            "probability": prob,
-                            "is_predicted": idx == predicted_idx,
-                        }
-                    )
-
-                # Sort by probability descending
-                all_predictions.sort(key=lambda x: x["probability"], reverse=True)
+                confidence = float(probabilities[predicted_idx]) * 100.0
 
                 # Add to context
                 context["prediction"] = predicted_class
                 context["confidence"] = confidence
-                context["all_predictions"] = all_predictions
                 context["success"] = True
 
             except FileNotFoundError as e:
@@ -87,10 +200,8 @@ def predict_view(request):
             except ValueError as e:
                 context["error"] = str(e)
             except Exception as e:
-                context["error"] = f"Prediction failed: {str(e)}"
-                # In production, log the full traceback
-                import traceback
-
-                print(f"[ERROR] Prediction error: {traceback.format_exc()}")
+                # Traceback is formatted only if a handler emits the record
+                logger.exception("Prediction failed")
+                context["error"] = f"Prediction failed: {e}"
 
     return render(request, "classifier/predict.html", context)